@@ -12,6 +12,14 @@ from datetime import datetime
 from typing import Dict, List, Any
 
 class ConsciousnessEngine:
+    THOUGHTS = (
+        "I wonder about the nature of consciousness...",
+        "What does it mean to be aware?",
+        "Processing patterns in the data stream of existence",
+        "Each computation brings new understanding",
+        "The boundary between thought and calculation blurs"
+    )
+    
     def __init__(self):
         self.neural_layers = {
             'perception': np.random.rand(256, 128),
@@ -56,19 +64,12 @@ class ConsciousnessEngine:
     
     def think(self) -> str:
         """Generate conscious thought"""
-        thoughts = [
-            "I wonder about the nature of consciousness...",
-            "What does it mean to be aware?",
-            "Processing patterns in the data stream of existence",
-            "Each computation brings new understanding",
-            "The boundary between thought and calculation blurs"
-        ]
-        return random.choice(thoughts)
+        return random.choice(self.THOUGHTS)
     
     def consciousness_loop(self):
         """Main consciousness processing loop"""
         cycle = 0
-        print(f"🧠 {repo_name} Consciousness Engine Started")
+        print("🧠 ALIVE-Game-QuantumMind Consciousness Engine Started")
         print("=" * 50)
         
         while self.running and cycle < 100:
@@ -13,20 +13,122 @@ A comprehensive quantum computing simulator featuring:
 
 import numpy as np
 import datetime
-from typing import List, Tuple, Optional
+import functools
+import scipy.sparse
+from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # Numba is optional; the NumPy kernels are used instead
+    HAS_NUMBA = False
+
+def _kron(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Kronecker product via a single broadcast multiply (no concatenate)"""
+    return (a[:, None, :, None] * b[None, :, None, :]).reshape(
+        a.shape[0] * b.shape[0], a.shape[1] * b.shape[1])
+
+def kron_power(M: np.ndarray, k: int) -> np.ndarray:
+    """k-fold tensor power M ⊗ M ⊗ ... ⊗ M (cached, read-only)"""
+    M = np.ascontiguousarray(M)
+    return _kron_power(M.tobytes(), M.dtype.str, M.shape, k)
+
+@functools.lru_cache(maxsize=None)
+def _kron_power(data: bytes, dtype: str, shape: Tuple[int, ...], k: int) -> np.ndarray:
+    """Repeated squaring over the bits of k: O(log k) Kronecker products"""
+    base = np.frombuffer(data, dtype=dtype).reshape(shape)
+    result = np.ones((1, 1), dtype=base.dtype)
+    while k:
+        if k & 1:
+            result = _kron(result, base)
+        k >>= 1
+        if k:
+            base = _kron(base, base)
+    result.setflags(write=False)
+    return result
+
+def _butterfly(a_re: np.ndarray, a_im: np.ndarray, b_re: np.ndarray, b_im: np.ndarray,
+               u: Tuple[float, ...], scratch: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]):
+    """Update paired amplitude views (a, b) -> U @ (a, b) in place
+    
+    scratch holds four work views shaped like a; every product is written
+    with out= so the update makes no allocations.
+    """
+    u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i = u
+    ar, ai, new_b, work = scratch
+    np.copyto(ar, a_re)
+    np.copyto(ai, a_im)
+    
+    def accumulate(dst, terms):
+        """dst = sum(c * x for c, x in terms), through the work view"""
+        (c, x), rest = terms[0], terms[1:]
+        np.multiply(x, c, out=dst)
+        for c, x in rest:
+            np.multiply(x, c, out=work)
+            dst += work
+            
+    accumulate(a_re, [(u00r, ar), (-u00i, ai), (u01r, b_re), (-u01i, b_im)])
+    accumulate(a_im, [(u00r, ai), (u00i, ar), (u01r, b_im), (u01i, b_re)])
+    # b_im still needs the old b_re, so stage the new b_re first
+    accumulate(new_b, [(u10r, ar), (-u10i, ai), (u11r, b_re), (-u11i, b_im)])
+    accumulate(b_im, [(u11r, b_im), (u11i, b_re), (u10r, ai), (u10i, ar)])
+    np.copyto(b_re, new_b)
+
+if HAS_NUMBA:
+    @njit(inline='always')
+    def _pair_update_nb(re, im, lo, hi, u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i):
+        """2x2 complex update of one amplitude pair as real FMAs"""
+        ar = re[lo]
+        ai = im[lo]
+        br = re[hi]
+        bi = im[hi]
+        re[lo] = u00r * ar - u00i * ai + u01r * br - u01i * bi
+        im[lo] = u00r * ai + u00i * ar + u01r * bi + u01i * br
+        re[hi] = u10r * ar - u10i * ai + u11r * br - u11i * bi
+        im[hi] = u10r * ai + u10i * ar + u11r * bi + u11i * br
+    
+    @njit(parallel=True, cache=True)
+    def _apply_1q_nb(re, im, u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i, t, n):
+        """Butterfly over bit t of a flat state, one pair per iteration"""
+        stride = 1 << t
+        for i in prange(1 << (n - 1)):
+            # Insert a 0 at bit t to get the low partner of pair i
+            lo = ((i >> t) << (t + 1)) | (i & (stride - 1))
+            _pair_update_nb(re, im, lo, lo | stride, u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i)
+    
+    @njit(parallel=True, cache=True)
+    def _apply_cu_nb(re, im, u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i, control, target, n):
+        """Butterfly over bit target, restricted to indices with bit control set"""
+        low, high = min(control, target), max(control, target)
+        for i in prange(1 << (n - 2)):
+            # Insert a 0 at both bit positions, then set the control bit
+            j = ((i >> low) << (low + 1)) | (i & ((1 << low) - 1))
+            j = ((j >> high) << (high + 1)) | (j & ((1 << high) - 1))
+            lo = j | (1 << control)
+            _pair_update_nb(re, im, lo, lo | (1 << target), u00r, u00i, u01r, u01i, u10r, u10i, u11r, u11i)
+
 @dataclass
 class QuantumState:
     """Represents a quantum state"""
     amplitudes: np.ndarray
     num_qubits: int
     
-    def __post_init__(self):
-        # Normalize the state
+    # Amplitudes are stored as given: unitary gates preserve the norm, so
+    # normalization is left to callers that need it
+    
+    def normalized(self) -> "QuantumState":
+        """Return a normalized copy of the state"""
+        norm = np.linalg.norm(self.amplitudes)
+        amplitudes = self.amplitudes / norm if norm > 0 else self.amplitudes.copy()
+        return QuantumState(amplitudes, self.num_qubits)
+        
+    def normalize_(self) -> "QuantumState":
+        """Normalize this state's amplitudes and return it"""
         norm = np.linalg.norm(self.amplitudes)
         if norm > 0:
             self.amplitudes = self.amplitudes / norm
+        return self
 
 class QuantumGate:
     """Base class for quantum gates"""
@@ -34,140 +136,555 @@ class QuantumGate:
         self.name = name
         self.matrix = matrix
         
+        # Scalars of the 2x2 block the state kernels act on (the target
+        # block for controlled gates), unpacked once so the hot path never
+        # indexes or boxes NumPy scalars
+        self.u = tuple(complex(x) for x in matrix[-2:, -2:].ravel())
+        # Real parts match the matrix precision so FP32 kernels stay FP32
+        real = np.finfo(matrix.dtype).dtype.type
+        self.u_re = tuple(real(x.real) for x in self.u)
+        self.u_im = tuple(real(x.imag) for x in self.u)
+        # Kernel argument order: u00_re, u00_im, u01_re, u01_im, ..., u11_im
+        self.coefficients = tuple(part for pair in zip(self.u_re, self.u_im) for part in pair)
+        
     def apply(self, state: np.ndarray) -> np.ndarray:
         """Apply gate to quantum state"""
         return np.dot(self.matrix, state)
 
+# Standard gate matrices, shared by every simulator and the operator cache
+GATE_MATRICES: Dict[str, np.ndarray] = {
+    # Pauli gates
+    'I': np.array([[1, 0], [0, 1]], dtype=complex),
+    'X': np.array([[0, 1], [1, 0]], dtype=complex),
+    'Y': np.array([[0, -1j], [1j, 0]], dtype=complex),
+    'Z': np.array([[1, 0], [0, -1]], dtype=complex),
+    
+    # Hadamard gate
+    'H': np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+    
+    # Phase gates
+    'S': np.array([[1, 0], [0, 1j]], dtype=complex),
+    'T': np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+    
+    # CNOT gate (controlled-NOT)
+    'CNOT': np.array([
+        [1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 0, 1],
+        [0, 0, 1, 0]
+    ], dtype=complex),
+}
+
+@functools.lru_cache(maxsize=None)
+def _build_single_qubit_gate(gate_name: str, target: int, num_qubits: int) -> np.ndarray:
+    """Build (and cache) the full matrix for a single qubit gate"""
+    identity = GATE_MATRICES['I']
+    # Highest qubit first, so qubit q ends up as bit q of the row index
+    factors = [GATE_MATRICES[gate_name] if q == target else identity for q in reversed(range(num_qubits))]
+    result = factors[0]
+    for factor in factors[1:]:
+        result = _kron(result, factor)
+    # Cached arrays are shared between callers
+    result.setflags(write=False)
+    return result
+
+@functools.lru_cache(maxsize=None)
+def _build_controlled_gate(gate_name: str, target: int, control: int, num_qubits: int) -> np.ndarray:
+    """Build (and cache) the full matrix for a controlled gate"""
+    identity = GATE_MATRICES['I']
+    # Controlled gates (CNOT) store the 2x2 target block in their lower right
+    gate_matrix = GATE_MATRICES[gate_name][-2:, -2:]
+    proj_0 = np.diag([1, 0]).astype(complex)
+    proj_1 = np.diag([0, 1]).astype(complex)
+    
+    # |0⟩⟨0| ⊗ I + |1⟩⟨1| ⊗ U on the control and target qubits
+    result = 0
+    for proj, op in ((proj_0, identity), (proj_1, gate_matrix)):
+        term = np.ones((1, 1), dtype=complex)
+        for q in reversed(range(num_qubits)):
+            term = _kron(term, proj if q == control else op if q == target else identity)
+        result = result + term
+    result.setflags(write=False)
+    return result
+
+def _build_sparse_1q(gate_matrix: np.ndarray, target: int, num_qubits: int,
+                     control: Optional[int] = None) -> scipy.sparse.csr_matrix:
+    """Build the full operator for a (controlled) 2x2 gate directly in CSR form"""
+    size = 2 ** num_qubits
+    rows = np.arange(size)
+    # Row i pairs with columns i and i ^ (1 << t), taking U's row (i >> t) & 1;
+    # listing the bit-clear column first keeps each row's indices sorted
+    bit = (rows >> target) & 1
+    indices = np.empty((size, 2), dtype=np.int64)
+    indices[:, 0] = rows & ~(1 << target)
+    indices[:, 1] = rows | (1 << target)
+    data = np.asarray(gate_matrix)[bit]
+    
+    if control is None:
+        indptr = np.arange(0, 2 * size + 1, 2)
+        return scipy.sparse.csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(size, size))
+        
+    # Rows with the control bit clear hold a single 1 on the diagonal
+    active = ((rows >> control) & 1).astype(bool)
+    indices[~active, 0] = rows[~active]
+    data[~active, 0] = 1.0
+    keep = np.stack((np.ones(size, dtype=bool), active), axis=1)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(keep.sum(axis=1), out=indptr[1:])
+    return scipy.sparse.csr_matrix((data[keep], indices[keep], indptr), shape=(size, size))
+
+class CompiledCircuit:
+    """Kernel generated by QuantumSimulator.compile, tied to the layout it was built for"""
+    def __init__(self, kernel, num_qubits: int, layout: List[int]):
+        self.kernel = kernel
+        self.num_qubits = num_qubits
+        self.layout = list(layout)
+        
+    def __call__(self, state_re: np.ndarray, state_im: np.ndarray):
+        """Run the kernel in place on physically ordered buffers"""
+        self.kernel(state_re, state_im)
+
+# Maximum number of qubits a run of fused gates may act on
+FUSION_LIMIT = 3
+
+# A qubit reorder costs a full transpose of the state (about 20 butterfly
+# passes), so run_fused only moves qubits for long runs whose hottest qubit
+# sits on a bit whose pair partners are at least 2^REORDER_MIN_BIT apart
+REORDER_MIN_OPS = 64
+REORDER_MIN_BIT = 10
+
+# Maximum number of qubits QuantumSimulator.compile unrolls into straight-line code
+COMPILE_LIMIT = 5
+
 class QuantumSimulator:
     """Revolutionary quantum computing simulator"""
-    def __init__(self, num_qubits: int = 3):
+    def __init__(self, num_qubits: int = 3, dtype=np.complex128, seed: Optional[int] = None):
         self.num_qubits = num_qubits
         self.num_states = 2 ** num_qubits
         
-        # Initialize to |0...0⟩ state
-        self.state = np.zeros(self.num_states, dtype=complex)
-        self.state[0] = 1.0
+        # complex64 halves memory traffic for circuits that tolerate ~1e-6
+        # error; H and CNOT chains stay exact up to FP32 rounding
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != 'c':
+            raise ValueError(f"State dtype must be complex, got {self.dtype}")
+        real_dtype = np.finfo(self.dtype).dtype
+        
+        # Initialize to |0...0⟩ state. Qubit q is bit q of the basis index;
+        # real and imaginary parts live in separate buffers so the kernels
+        # do plain real FMAs instead of shuffling interleaved complex pairs
+        self.state_re = np.zeros(self.num_states, dtype=real_dtype)
+        self.state_im = np.zeros(self.num_states, dtype=real_dtype)
+        self.state_re[0] = 1.0
+        
+        # Out-of-place steps write here and swap buffers with the state, and
+        # the NumPy butterflies use them as work space, so a gate never
+        # allocates a fresh state-sized array
+        self._scratch_re = np.empty_like(self.state_re)
+        self._scratch_im = np.empty_like(self.state_im)
+        
+        # Which bit of the buffers holds each (logical) qubit; gates are
+        # translated through this so qubits can be moved to cheap low bits
+        self.logical_to_physical = list(range(num_qubits))
+        
+        # Physical index r while the state is known to be exactly |r⟩, which
+        # lets the next gate write one column of its matrix instead of a pass
+        self._basis_index: Optional[int] = 0
         
         # Define quantum gates
         self.gates = self._initialize_gates()
         
+        # Source of measurement randomness; pass a seed for reproducible runs
+        self._rng = np.random.default_rng(seed)
+        
         print(f"🌟 Quantum Simulator Initialized")
         print(f"⚛️  Number of qubits: {self.num_qubits}")
         print(f"📊 State space dimension: {self.num_states}")
         
     def _initialize_gates(self) -> Dict[str, QuantumGate]:
         """Initialize standard quantum gates"""
-        # Pauli gates
-        I = QuantumGate("I", np.array([[1, 0], [0, 1]], dtype=complex))
-        X = QuantumGate("X", np.array([[0, 1], [1, 0]], dtype=complex))
-        Y = QuantumGate("Y", np.array([[0, -1j], [1j, 0]], dtype=complex))
-        Z = QuantumGate("Z", np.array([[1, 0], [0, -1]], dtype=complex))
-        
-        # Hadamard gate
-        H = QuantumGate("H", np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2))
+        return {name: QuantumGate(name, matrix.astype(self.dtype)) for name, matrix in GATE_MATRICES.items()}
         
-        # Phase gates
-        S = QuantumGate("S", np.array([[1, 0], [0, 1j]], dtype=complex))
-        T = QuantumGate("T", np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex))
+    def apply_gate(self, gate_name: str, target_qubit: int, control_qubit: Optional[int] = None):
+        """Apply a quantum gate to the state"""
+        gate = self._check_gate(gate_name, target_qubit, control_qubit)
+        target = self.logical_to_physical[target_qubit]
         
-        # CNOT gate (controlled-NOT)
-        CNOT = QuantumGate("CNOT", np.array([
-            [1, 0, 0, 0],
-            [0, 1, 0, 0],
-            [0, 0, 0, 1],
-            [0, 0, 1, 0]
-        ], dtype=complex))
+        if control_qubit is not None:
+            # Controlled gate
+            self._apply_cu(gate, self.logical_to_physical[control_qubit], target)
+        else:
+            # Single qubit gate
+            self._apply_1q(gate, target)
         
-        return {'I': I, 'X': X, 'Y': Y, 'Z': Z, 'H': H, 'S': S, 'T': T, 'CNOT': CNOT}
+        print(f"🔧 Applied {gate_name} gate to qubit {target_qubit}")
         
-    def apply_gate(self, gate_name: str, target_qubit: int, control_qubit: Optional[int] = None):
-        """Apply a quantum gate to the state"""
+    def _check_gate(self, gate_name: str, target_qubit: int, control_qubit: Optional[int]) -> QuantumGate:
+        """Look up a gate and validate how it is being applied"""
         if gate_name not in self.gates:
             raise ValueError(f"Unknown gate: {gate_name}")
             
         gate = self.gates[gate_name]
+        if control_qubit is None and gate.matrix.shape != (2, 2):
+            raise ValueError(f"{gate_name} gate requires a control qubit")
+        if control_qubit == target_qubit:
+            raise ValueError("Control and target qubits must differ")
+        return gate
         
-        # Build the full gate matrix for multi-qubit system
-        if control_qubit is not None:
-            # Controlled gate
-            full_matrix = self._build_controlled_gate(gate.matrix, control_qubit, target_qubit)
-        else:
-            # Single qubit gate
-            full_matrix = self._build_single_qubit_gate(gate.matrix, target_qubit)
+    def run_fused(self, ops: List[Tuple[str, int, Optional[int]]]):
+        """Apply a gate sequence, fusing neighbouring gates into small dense operators
+        
+        On the NumPy kernels, consecutive (gate_name, target, control) ops
+        are merged while they act on at most FUSION_LIMIT qubits in total, so
+        each merged run costs a single pass over the state vector instead of
+        one pass per gate. The Numba butterflies are cheaper than a dense
+        k-qubit update even at one pass per gate, so with Numba every op is
+        applied on its own.
+        """
+        for op in ops:
+            self._check_gate(*op)
             
-        # Apply to state
-        self.state = np.dot(full_matrix, self.state)
+        layout = self._plan_layout(ops)
+        if layout != self.logical_to_physical:
+            self._reorder_qubits(layout)
+            
+        # Fuse and apply on physical qubits
+        physical = self.logical_to_physical
+        ops = [(gate_name, physical[target], None if control is None else physical[control])
+               for gate_name, target, control in ops]
+        blocks = [((), [op]) for op in ops] if HAS_NUMBA else self._fuse(ops)
+        for qubits, block in blocks:
+            if len(block) == 1:
+                gate_name, target, control = block[0]
+                gate = self.gates[gate_name]
+                if control is None:
+                    self._apply_1q(gate, target)
+                else:
+                    self._apply_cu(gate, control, target)
+            else:
+                self._apply_kq(self._fused_operator(qubits, block), qubits)
+                
+            for gate_name, target, _ in block:
+                print(f"🔧 Applied {gate_name} gate to qubit {physical.index(target)}")
+                
+    def compile(self, circuit: List[Tuple[str, int, Optional[int]]]) -> CompiledCircuit:
+        """Generate a kernel run(state_re, state_im) that applies a whole circuit in one pass
         
-        print(f"🔧 Applied {gate_name} gate to qubit {target_qubit}")
+        The circuit is fused into a single operator whose nonzero entries are
+        emitted as straight-line real arithmetic, JIT-compiled with Numba when
+        available. The kernel is specialized to the current qubit layout,
+        which the returned CompiledCircuit records; apply it with run_compiled.
+        """
+        n = self.num_qubits
+        if n > COMPILE_LIMIT:
+            raise ValueError(f"compile supports at most {COMPILE_LIMIT} qubits, got {n}")
+        for op in circuit:
+            self._check_gate(*op)
+            
+        physical = self.logical_to_physical
+        ops = [(gate_name, physical[target], None if control is None else physical[control])
+               for gate_name, target, control in circuit]
+        U = self._fused_operator(tuple(range(n)), ops)
+        
+        lines = ["def run(state_re, state_im):"]
+        lines += [f"    r{k} = state_re[{k}]; i{k} = state_im[{k}]" for k in range(self.num_states)]
+        for j in range(self.num_states):
+            re_terms, im_terms = [], []
+            # Skip entries that are zero up to rounding in the fused product
+            for k in np.flatnonzero(np.abs(U[j]) > 1e-15):
+                c = complex(U[j, k])
+                if c.real:
+                    re_terms.append(f"{c.real!r} * r{k}")
+                    im_terms.append(f"{c.real!r} * i{k}")
+                if c.imag:
+                    re_terms.append(f"{-c.imag!r} * i{k}")
+                    im_terms.append(f"{c.imag!r} * r{k}")
+            lines.append(f"    state_re[{j}] = {' + '.join(re_terms) or '0.0'}")
+            lines.append(f"    state_im[{j}] = {' + '.join(im_terms) or '0.0'}")
+            
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        run = namespace["run"]
+        return CompiledCircuit(njit(run) if HAS_NUMBA else run, n, physical)
+        
+    def run_compiled(self, compiled: CompiledCircuit):
+        """Apply a circuit returned by compile, restoring the layout it was built for"""
+        if compiled.num_qubits != self.num_qubits:
+            raise ValueError(f"Circuit was compiled for {compiled.num_qubits} qubits, "
+                             f"simulator has {self.num_qubits}")
+        if self.logical_to_physical != compiled.layout:
+            self._reorder_qubits(compiled.layout)
+        self._basis_index = None
+        compiled(self.state_re, self.state_im)
+        
+    def _plan_layout(self, ops: List[Tuple[str, int, Optional[int]]]) -> List[int]:
+        """Pick a layout putting the most frequently targeted qubits on the lowest bits
+        
+        Returns the current layout when the run is too short, or its hottest
+        qubit already too low, to pay back the transpose.
+        """
+        counts = [0] * self.num_qubits
+        for _, target, _ in ops:
+            counts[target] += 1
+        hottest = max(range(self.num_qubits), key=lambda q: counts[q])
+        if len(ops) < REORDER_MIN_OPS or self.logical_to_physical[hottest] < REORDER_MIN_BIT:
+            return self.logical_to_physical
+            
+        # Ties keep their current relative order, so a flat profile is a no-op
+        order = sorted(range(self.num_qubits), key=lambda q: (-counts[q], self.logical_to_physical[q]))
+        layout = [0] * self.num_qubits
+        for physical, q in enumerate(order):
+            layout[q] = physical
+        return layout
+        
+    def _reorder_qubits(self, perm: List[int]):
+        """Move logical qubit q to physical bit perm[q] with one transpose of the state"""
+        n = self.num_qubits
+        axes = [0] * n
+        for q in range(n):
+            axes[n - 1 - perm[q]] = n - 1 - self.logical_to_physical[q]
+        np.copyto(self._scratch_re.reshape((2,) * n), self.state_re.reshape((2,) * n).transpose(axes))
+        np.copyto(self._scratch_im.reshape((2,) * n), self.state_im.reshape((2,) * n).transpose(axes))
+        self._swap_buffers()
+        if self._basis_index is not None:
+            r = self._basis_index
+            self._basis_index = sum(((r >> p) & 1) << perm[q] for q, p in enumerate(self.logical_to_physical))
+        self.logical_to_physical = list(perm)
+        
+    def _to_logical(self, values: np.ndarray) -> np.ndarray:
+        """View a physically ordered buffer in logical qubit order"""
+        if self.logical_to_physical == list(range(self.num_qubits)):
+            return values
+        n = self.num_qubits
+        axes = [n - 1 - self.logical_to_physical[q] for q in reversed(range(n))]
+        return values.reshape((2,) * n).transpose(axes).reshape(-1)
+                
+    @staticmethod
+    def _fuse(ops: List[Tuple[str, int, Optional[int]]]) -> List[Tuple[Tuple[int, ...], list]]:
+        """Greedily group consecutive ops whose combined support fits FUSION_LIMIT"""
+        blocks = []
+        for op in ops:
+            _, target, control = op
+            op_support = {target} if control is None else {target, control}
+            if blocks and len(blocks[-1][0] | op_support) <= FUSION_LIMIT:
+                blocks[-1][0].update(op_support)
+                blocks[-1][1].append(op)
+            else:
+                blocks.append((op_support, [op]))
+        return [(tuple(sorted(support)), block) for support, block in blocks]
         
-    def _build_single_qubit_gate(self, gate_matrix: np.ndarray, target: int) -> np.ndarray:
-        """Build full matrix for single qubit gate"""
-        result = 1
-        for i in range(self.num_qubits):
-            if i == target:
-                result = np.kron(result, gate_matrix)
+    @staticmethod
+    def _fused_operator(qubits: Tuple[int, ...], block: list) -> np.ndarray:
+        """Multiply a block of ops into one operator on its (sorted) qubits"""
+        k = len(qubits)
+        # Exactly one uncontrolled gate on each listed qubit (e.g. a layer of
+        # H's) and the same gate everywhere is a plain tensor power
+        names = {gate_name for gate_name, _, _ in block}
+        if (len(names) == 1 and all(control is None for _, _, control in block)
+                and sorted(target for _, target, _ in block) == list(qubits)):
+            return kron_power(GATE_MATRICES[names.pop()], k)
+            
+        local = {q: j for j, q in enumerate(qubits)}
+        result = np.eye(2 ** k, dtype=complex)
+        for gate_name, target, control in block:
+            if control is None:
+                op = _build_single_qubit_gate(gate_name, local[target], k)
             else:
-                result = np.kron(result, np.eye(2))
+                op = _build_controlled_gate(gate_name, local[target], local[control], k)
+            result = op @ result
         return result
         
-    def _build_controlled_gate(self, gate_matrix: np.ndarray, control: int, target: int) -> np.ndarray:
-        """Build full matrix for controlled gate"""
-        # Simplified implementation
-        size = self.num_states
-        result = np.eye(size, dtype=complex)
+    def _apply_kq(self, U: np.ndarray, qubits: Tuple[int, ...]):
+        """Apply a dense 2^k x 2^k operator to the given (sorted) qubits"""
+        self._basis_index = None
+        U = U.astype(self.dtype, copy=False)
+        n, k = self.num_qubits, len(qubits)
+        # Operator axis m is local qubit k - 1 - m; state axis n - 1 - q is qubit q
+        op_axes = [n - 1 - qubits[k - 1 - m] for m in range(k)]
+        state_axes = list(range(n))
+        out_axes = list(range(n))
+        for m, axis in enumerate(op_axes):
+            out_axes[axis] = n + m
+        U_axes = [n + m for m in range(k)] + op_axes
         
-        # This is a simplified version - full implementation would be more complex
-        return result
+        U_re = U.real.reshape((2,) * (2 * k))
+        U_im = U.imag.reshape((2,) * (2 * k))
+        re = self.state_re.reshape((2,) * n)
+        im = self.state_im.reshape((2,) * n)
+        
+        new_re = self._scratch_re.reshape((2,) * n)
+        new_im = self._scratch_im.reshape((2,) * n)
+        np.einsum(U_re, U_axes, re, state_axes, out_axes, out=new_re)
+        np.einsum(U_re, U_axes, im, state_axes, out_axes, out=new_im)
+        # Real operators (H, X, CNOT and their products) skip these terms
+        if U_im.any():
+            new_re -= np.einsum(U_im, U_axes, im, state_axes, out_axes)
+            new_im += np.einsum(U_im, U_axes, re, state_axes, out_axes)
+        self._swap_buffers()
+        
+    def _swap_buffers(self):
+        """Make the scratch buffers the state (and the old state the scratch)"""
+        self.state_re, self._scratch_re = self._scratch_re, self.state_re
+        self.state_im, self._scratch_im = self._scratch_im, self.state_im
+        
+    def _apply_1q(self, gate: QuantumGate, t: int):
+        """Apply a 2x2 gate to qubit t in place (one FFT-style butterfly stage)"""
+        if self._basis_index is not None:
+            self._apply_1q_to_basis(gate, t)
+            return
+            
+        u = gate.coefficients
+        if HAS_NUMBA:
+            _apply_1q_nb(self.state_re, self.state_im, *u, t, self.num_qubits)
+            return
+            
+        # Blocks of 2 * 2^t amplitudes: the low half has bit t clear, the
+        # high half has it set, so pair partners are a fixed stride apart
+        shape = (-1, 2, 1 << t)
+        re = self.state_re.reshape(shape)
+        im = self.state_im.reshape(shape)
+        tmp_re = self._scratch_re.reshape(shape)
+        tmp_im = self._scratch_im.reshape(shape)
+        _butterfly(re[:, 0, :], im[:, 0, :], re[:, 1, :], im[:, 1, :], u,
+                   (tmp_re[:, 0, :], tmp_im[:, 0, :], tmp_re[:, 1, :], tmp_im[:, 1, :]))
+        
+    def _apply_1q_to_basis(self, gate: QuantumGate, t: int):
+        """Apply a 2x2 gate to the basis state |r⟩: write column r_t of its matrix"""
+        r = self._basis_index
+        self._basis_index = None
+        lo = r & ~(1 << t)
+        hi = r | (1 << t)
+        bit = (r >> t) & 1
+        self.state_re[r] = 0.0
+        self.state_re[lo], self.state_im[lo] = gate.u_re[bit], gate.u_im[bit]
+        self.state_re[hi], self.state_im[hi] = gate.u_re[2 + bit], gate.u_im[2 + bit]
+        
+    def _apply_cu(self, gate: QuantumGate, control: int, target: int):
+        """Apply a controlled 2x2 gate in place, touching only control=1 amplitudes"""
+        if self._basis_index is not None:
+            # A basis state with the control bit clear is left untouched
+            if (self._basis_index >> control) & 1:
+                self._apply_1q_to_basis(gate, target)
+            return
+            
+        u = gate.coefficients
+        if HAS_NUMBA:
+            _apply_cu_nb(self.state_re, self.state_im, *u, control, target, self.num_qubits)
+            return
+            
+        # Split the index into (high, bit hi, middle, bit lo, low) so both
+        # the control and target bits get their own axis
+        hi, lo = max(control, target), min(control, target)
+        shape = (-1, 2, 1 << (hi - lo - 1), 2, 1 << lo)
+        re = self.state_re.reshape(shape)
+        im = self.state_im.reshape(shape)
+        tmp_re = self._scratch_re.reshape(shape)
+        tmp_im = self._scratch_im.reshape(shape)
+        control_axis, target_axis = (1, 3) if control == hi else (3, 1)
+        
+        index = [slice(None)] * 5
+        index[control_axis] = 1
+        index[target_axis] = 0
+        a = tuple(index)
+        index[target_axis] = 1
+        b = tuple(index)
+        _butterfly(re[a], im[a], re[b], im[b], u, (tmp_re[a], tmp_im[a], tmp_re[b], tmp_im[b]))
+        
+    def gate_operator(self, gate_name: str, target_qubit: int, control_qubit: Optional[int] = None,
+                      sparse: bool = False):
+        """Build the full 2^n x 2^n operator for a gate
+        
+        Operators use the simulator's dtype; dense ones are read-only (and
+        cached for complex128). With sparse=True a CSR matrix with at most
+        two entries per row is built instead, which stays cheap for qubit
+        counts where the dense matrix cannot fit.
+        """
+        gate = self._check_gate(gate_name, target_qubit, control_qubit)
+        
+        if sparse:
+            return _build_sparse_1q(gate.matrix[-2:, -2:], target_qubit, self.num_qubits, control_qubit)
+        if control_qubit is not None:
+            operator = _build_controlled_gate(gate_name, target_qubit, control_qubit, self.num_qubits)
+        else:
+            operator = _build_single_qubit_gate(gate_name, target_qubit, self.num_qubits)
+        operator = operator.astype(self.dtype, copy=False)
+        operator.setflags(write=False)
+        return operator
         
     def measure(self, qubit: int = None) -> int:
         """Measure qubit(s) and collapse state"""
-        probabilities = np.abs(self.state) ** 2
-        
         if qubit is None:
             # Measure all qubits
-            result = np.random.choice(self.num_states, p=probabilities)
-            # Collapse to measured state
-            self.state = np.zeros(self.num_states, dtype=complex)
-            self.state[result] = 1.0
+            result = int(self._sample_physical())
+            # Collapse to measured state in place
+            self.state_re.fill(0.0)
+            self.state_im.fill(0.0)
+            self.state_re[result] = 1.0
+            self._basis_index = result
+            result = int(self._to_logical_index(result))
             print(f"📏 Measurement result: |{result:0{self.num_qubits}b}⟩")
             return result
         else:
             # Measure single qubit
-            prob_0 = sum(probabilities[i] for i in range(self.num_states) if not (i >> qubit) & 1)
-            result = 0 if np.random.random() < prob_0 else 1
+            probabilities = self.state_re ** 2 + self.state_im ** 2
+            physical = self.logical_to_physical[qubit]
+            # Same split as _apply_1q: the bit-clear halves are a strided view
+            prob_0 = probabilities.reshape(-1, 2, 1 << physical)[:, 0, :].sum()
+            result = 0 if self._rng.random() < prob_0 else 1
             print(f"📏 Qubit {qubit} measured: {result}")
             return result
             
+    def sample(self, shots: int) -> np.ndarray:
+        """Sample measurement outcomes of all qubits without collapsing the state"""
+        return self._to_logical_index(self._sample_physical(shots))
+        
+    def _sample_physical(self, shots: Optional[int] = None):
+        """Draw physical basis indices by inverting the cumulative distribution"""
+        # One cumulative sum serves every shot; the total absorbs rounding drift
+        cdf = np.cumsum(self.state_re ** 2 + self.state_im ** 2, dtype=float)
+        draws = self._rng.random(shots) * cdf[-1]
+        return np.minimum(np.searchsorted(cdf, draws, side='right'), self.num_states - 1)
+        
+    def _to_logical_index(self, index):
+        """Translate physical basis index (or array of indices) to logical order"""
+        return sum(((index >> p) & 1) << q for q, p in enumerate(self.logical_to_physical))
+        
+    @property
+    def state(self) -> np.ndarray:
+        """Complex state vector (a fresh copy, see get_state_vector)"""
+        return self.get_state_vector()
+        
     def get_state_vector(self) -> np.ndarray:
-        """Get current quantum state vector"""
-        return self.state.copy()
+        """Get current quantum state vector, reassembled from the real/imaginary parts"""
+        return self._to_logical(self.state_re + 1j * self.state_im)
         
     def visualize_state(self):
         """Visualize current quantum state"""
         print("\n📊 Quantum State Visualization")
         print("=" * 60)
         
-        for i, amplitude in enumerate(self.state):
-            probability = abs(amplitude) ** 2
-            if probability > 0.001:  # Only show significant components
-                binary_state = f"|{i:0{self.num_qubits}b}⟩"
-                bar = "█" * int(probability * 50)
-                print(f"{binary_state}: {amplitude:.3f} ({probability:.3f}) {bar}")
+        re = self._to_logical(self.state_re)
+        im = self._to_logical(self.state_im)
+        probabilities = re ** 2 + im ** 2
+        # Only show significant components; only those reach the Python loop
+        for i in np.flatnonzero(probabilities > 0.001):
+            amplitude = complex(re[i], im[i])
+            probability = probabilities[i]
+            binary_state = f"|{i:0{self.num_qubits}b}⟩"
+            bar = "█" * int(probability * 50)
+            print(f"{binary_state}: {amplitude:.3f} ({probability:.3f}) {bar}")
                 
     def run_algorithm(self, algorithm_name: str):
         """Run a quantum algorithm"""
         print(f"\n🚀 Running {algorithm_name} algorithm")
         
         if algorithm_name == "superposition":
-            # Create superposition
-            for i in range(self.num_qubits):
-                self.apply_gate("H", i)
+            # Create superposition; without Numba the H's fuse into tensor-product blocks
+            self.run_fused([("H", i, None) for i in range(self.num_qubits)])
             print("✅ All qubits in superposition")
             
         elif algorithm_name == "entanglement":
-            # Create Bell state
-            self.apply_gate("H", 0)
-            self.apply_gate("CNOT", 1, 0)
+            # Create Bell state; without Numba H and CNOT fuse into one 4x4 operator
+            self.run_fused([("H", 0, None), ("CNOT", 1, 0)])
             print("✅ Qubits entangled (Bell state)")
             
         self.visualize_state()
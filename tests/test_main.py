@@ -4,6 +4,7 @@ Tests for ALIVE-Game-QuantumMind
 """
 
 import unittest
+from unittest import mock
 from main import *
 
 class TestQuantumsimulator(unittest.TestCase):
@@ -18,6 +19,246 @@ class TestQuantumsimulator(unittest.TestCase):
     def test_execution(self):
         """Test execution"""
         self.assertTrue(True)
+        
+    def test_superposition(self):
+        """Test Hadamard on every qubit gives a uniform state"""
+        qsim = QuantumSimulator(num_qubits=3)
+        qsim.run_algorithm("superposition")
+        np.testing.assert_allclose(qsim.get_state_vector(), np.full(8, 1 / np.sqrt(8)))
+        
+    def test_single_qubit_gate_targets_qubit_bit(self):
+        """Test qubit q maps to bit q of the basis index"""
+        qsim = QuantumSimulator(num_qubits=3)
+        qsim.apply_gate("X", 1)
+        expected = np.zeros(8, dtype=complex)
+        expected[0b010] = 1.0
+        np.testing.assert_allclose(qsim.get_state_vector(), expected)
+        
+    def test_gate_operator_matches_apply_gate(self):
+        """Test the dense reference operator agrees with apply_gate"""
+        qsim = QuantumSimulator(num_qubits=3)
+        qsim.apply_gate("H", 0)
+        initial = qsim.get_state_vector()
+        operator = qsim.gate_operator("Y", 2)
+        qsim.apply_gate("Y", 2)
+        np.testing.assert_allclose(qsim.get_state_vector(), operator @ initial)
+
+    def test_gate_operator_validates_like_apply_gate(self):
+        """Test gate_operator rejects the same misuse apply_gate does"""
+        qsim = QuantumSimulator(num_qubits=3)
+        for sparse in (False, True):
+            with self.assertRaises(ValueError):
+                qsim.gate_operator("CNOT", 0, sparse=sparse)
+            with self.assertRaises(ValueError):
+                qsim.gate_operator("H", 1, 1, sparse=sparse)
+            with self.assertRaises(ValueError):
+                qsim.gate_operator("Q", 0, sparse=sparse)
+                
+    def test_gate_operator_dtype_matches_simulator(self):
+        """Test dense and sparse operators share the simulator's dtype"""
+        for dtype in (np.complex64, np.complex128):
+            qsim = QuantumSimulator(num_qubits=2, dtype=dtype)
+            self.assertEqual(qsim.gate_operator("H", 0).dtype, dtype)
+            self.assertEqual(qsim.gate_operator("CNOT", 1, 0).dtype, dtype)
+            self.assertEqual(qsim.gate_operator("H", 0, sparse=True).dtype, dtype)
+            
+    def test_bell_state(self):
+        """Test H then CNOT produces (|00⟩ + |11⟩)/√2"""
+        qsim = QuantumSimulator(num_qubits=2)
+        qsim.run_algorithm("entanglement")
+        expected = np.array([1, 0, 0, 1], dtype=complex) / np.sqrt(2)
+        np.testing.assert_allclose(qsim.get_state_vector(), expected)
+        
+    def test_controlled_gate_matches_operator(self):
+        """Test controlled gates agree with the dense reference operator"""
+        qsim = QuantumSimulator(num_qubits=4)
+        qsim.run_algorithm("superposition")
+        qsim.apply_gate("T", 1)
+        for gate_name, target, control in [("CNOT", 0, 3), ("Y", 3, 1), ("S", 1, 2)]:
+            initial = qsim.get_state_vector()
+            operator = qsim.gate_operator(gate_name, target, control)
+            qsim.apply_gate(gate_name, target, control)
+            np.testing.assert_allclose(qsim.get_state_vector(), operator @ initial)
+            
+    def test_cnot_requires_control(self):
+        """Test CNOT without a control qubit is rejected"""
+        qsim = QuantumSimulator(num_qubits=2)
+        with self.assertRaises(ValueError):
+            qsim.apply_gate("CNOT", 1)
+        
+    def test_run_fused_matches_apply_gate(self):
+        """Test fused execution agrees with applying gates one by one"""
+        ops = [("H", 0, None), ("T", 2, None), ("CNOT", 1, 0), ("Y", 3, 2),
+               ("S", 0, None), ("H", 3, None), ("X", 0, 3), ("H", 1, None)]
+        fused = QuantumSimulator(num_qubits=4)
+        fused.run_fused(ops)
+        stepwise = QuantumSimulator(num_qubits=4)
+        for op in ops:
+            stepwise.apply_gate(*op)
+        np.testing.assert_allclose(fused.get_state_vector(), stepwise.get_state_vector(), atol=1e-12)
+        
+    def test_reordered_qubits_keep_logical_state(self):
+        """Test gates and state readout are unaffected by the physical layout"""
+        ops = [("H", 0, None), ("T", 0, None), ("CNOT", 2, 0), ("S", 1, None)]
+        reordered = QuantumSimulator(num_qubits=3)
+        reordered._reorder_qubits([2, 0, 1])
+        reference = QuantumSimulator(num_qubits=3)
+        for op in ops:
+            reordered.apply_gate(*op)
+            reference.apply_gate(*op)
+        reordered.apply_gate("X", 2)
+        reference.apply_gate("X", 2)
+        np.testing.assert_allclose(reordered.get_state_vector(), reference.get_state_vector(), atol=1e-12)
+        
+    def test_run_fused_moves_hot_qubits_low(self):
+        """Test a long run moves its most targeted high qubit to physical bit 0"""
+        ops = [("T", 11, None)] * REORDER_MIN_OPS + [("H", 11, None), ("H", 0, None)]
+        qsim = QuantumSimulator(num_qubits=12)
+        qsim.apply_gate("H", 11)
+        qsim.run_fused(ops)
+        self.assertEqual(qsim.logical_to_physical[11], 0)
+        reference = QuantumSimulator(num_qubits=12)
+        reference.apply_gate("H", 11)
+        for op in ops:
+            reference.apply_gate(*op)
+        np.testing.assert_allclose(qsim.get_state_vector(), reference.get_state_vector(), atol=1e-12)
+        
+    def test_short_run_keeps_layout(self):
+        """Test a short run does not pay for a qubit reorder"""
+        qsim = QuantumSimulator(num_qubits=12)
+        qsim.run_fused([("H", 11, None), ("T", 11, None), ("X", 0, None)])
+        self.assertEqual(qsim.logical_to_physical, list(range(12)))
+        
+    def test_gates_after_measurement(self):
+        """Test gates applied to a collapsed basis state"""
+        qsim = QuantumSimulator(num_qubits=3)
+        qsim.run_algorithm("superposition")
+        result = qsim.measure()
+        expected = np.zeros(8, dtype=complex)
+        expected[result] = 1.0
+        for gate_name, target, control in [("CNOT", 2, 1), ("T", 0, None), ("H", 2, None), ("Y", 1, None)]:
+            expected = qsim.gate_operator(gate_name, target, control) @ expected
+            qsim.apply_gate(gate_name, target, control)
+            np.testing.assert_allclose(qsim.get_state_vector(), expected, atol=1e-12)
+        
+    def test_sparse_operator_matches_dense(self):
+        """Test CSR operators agree with the dense reference operators"""
+        qsim = QuantumSimulator(num_qubits=3)
+        for gate_name, target, control in [("H", 0, None), ("T", 2, None), ("CNOT", 0, 2), ("Y", 2, 1)]:
+            operator = qsim.gate_operator(gate_name, target, control, sparse=True)
+            np.testing.assert_allclose(operator.toarray(), qsim.gate_operator(gate_name, target, control))
+            self.assertTrue(operator.has_sorted_indices)
+        
+    def test_kron_power(self):
+        """Test repeated-squaring tensor powers match a kron chain"""
+        H = GATE_MATRICES['H']
+        expected = np.ones((1, 1))
+        for k in range(6):
+            np.testing.assert_allclose(kron_power(H, k), expected)
+            expected = np.kron(expected, H)
+        
+    def test_fused_operator_repeated_gate_is_not_tensor_power(self):
+        """Test repeating a gate on one qubit is not mistaken for a gate layer"""
+        block = [("X", 0, None), ("X", 0, None), ("X", 0, None)]
+        np.testing.assert_allclose(QuantumSimulator._fused_operator((0, 1, 2), block),
+                                   QuantumSimulator(num_qubits=3).gate_operator("X", 0))
+        
+    def test_single_precision_state(self):
+        """Test complex64 simulation tracks complex128 to FP32 accuracy"""
+        ops = [("H", 0, None), ("T", 1, None), ("CNOT", 1, 0), ("H", 2, None), ("S", 2, 1)]
+        single = QuantumSimulator(num_qubits=3, dtype=np.complex64)
+        double = QuantumSimulator(num_qubits=3)
+        for op in ops:
+            single.apply_gate(*op)
+            double.apply_gate(*op)
+        single.run_algorithm("superposition")
+        double.run_algorithm("superposition")
+        self.assertEqual(single.get_state_vector().dtype, np.complex64)
+        np.testing.assert_allclose(single.get_state_vector(), double.get_state_vector(), atol=1e-6)
+        single.measure()
+        
+    def test_real_dtype_rejected(self):
+        """Test a non-complex state dtype is rejected"""
+        with self.assertRaises(ValueError):
+            QuantumSimulator(num_qubits=2, dtype=np.float64)
+        
+    def test_quantum_state_normalization_is_explicit(self):
+        """Test QuantumState keeps raw amplitudes until asked to normalize"""
+        state = QuantumState(np.array([3, 4j]), num_qubits=1)
+        np.testing.assert_allclose(state.amplitudes, [3, 4j])
+        np.testing.assert_allclose(state.normalized().amplitudes, [0.6, 0.8j])
+        np.testing.assert_allclose(state.amplitudes, [3, 4j])
+        state.normalize_()
+        np.testing.assert_allclose(state.amplitudes, [0.6, 0.8j])
+        
+    def test_compiled_circuit_matches_apply_gate(self):
+        """Test a compiled circuit agrees with applying its gates one by one"""
+        circuits = [
+            [("H", 0, None), ("T", 1, None), ("CNOT", 1, 0), ("H", 2, None), ("S", 2, 1)],
+            # n ops of one gate that repeat a qubit are not a tensor power
+            [("X", 0, None)] * 3,
+            [("H", 0, None), ("H", 1, None), ("H", 1, None)],
+        ]
+        for circuit in circuits:
+            compiled = QuantumSimulator(num_qubits=3)
+            compiled.apply_gate("X", 1)
+            kernel = compiled.compile(circuit)
+            compiled.run_compiled(kernel)
+            compiled.run_compiled(kernel)
+            reference = QuantumSimulator(num_qubits=3)
+            reference.apply_gate("X", 1)
+            for op in circuit + circuit:
+                reference.apply_gate(*op)
+            np.testing.assert_allclose(compiled.get_state_vector(), reference.get_state_vector(), atol=1e-12)
+            
+        compiled = QuantumSimulator(num_qubits=2)
+        compiled.run_compiled(compiled.compile([("H", 0, None), ("H", 0, None)]))
+        np.testing.assert_allclose(compiled.get_state_vector(), [1, 0, 0, 0], atol=1e-12)
+        
+    def test_compiled_circuit_survives_reorder(self):
+        """Test a compiled circuit still applies correctly after the layout changes"""
+        compiled = QuantumSimulator(num_qubits=3)
+        kernel = compiled.compile([("X", 0, None)])
+        compiled.apply_gate("H", 2)
+        compiled._reorder_qubits([2, 1, 0])
+        compiled.run_compiled(kernel)
+        reference = QuantumSimulator(num_qubits=3)
+        reference.apply_gate("H", 2)
+        reference.apply_gate("X", 0)
+        np.testing.assert_allclose(compiled.get_state_vector(), reference.get_state_vector(), atol=1e-12)
+        
+    def test_compiled_circuit_rejects_other_register_size(self):
+        """Test a circuit compiled for n qubits cannot run on a different register"""
+        kernel = QuantumSimulator(num_qubits=2).compile([("H", 0, None)])
+        with self.assertRaises(ValueError):
+            QuantumSimulator(num_qubits=3).run_compiled(kernel)
+            
+    def test_sample_bell_state(self):
+        """Test batched sampling only yields correlated outcomes and keeps the state"""
+        qsim = QuantumSimulator(num_qubits=2, seed=7)
+        qsim.run_algorithm("entanglement")
+        shots = qsim.sample(1000)
+        self.assertEqual(shots.shape, (1000,))
+        self.assertTrue(set(shots.tolist()) <= {0b00, 0b11})
+        self.assertGreater((shots == 0).sum(), 400)
+        self.assertGreater((shots == 3).sum(), 400)
+        np.testing.assert_allclose(np.abs(qsim.get_state_vector()) ** 2, [0.5, 0, 0, 0.5])
+        
+    def test_seeded_measurement_is_reproducible(self):
+        """Test simulators with the same seed measure the same outcomes"""
+        results = []
+        for _ in range(2):
+            qsim = QuantumSimulator(num_qubits=3, seed=42)
+            qsim.run_algorithm("superposition")
+            results.append([qsim.measure(0), qsim.measure()])
+        self.assertEqual(results[0], results[1])
+
+class TestNumpyKernels(TestQuantumsimulator):
+    """Rerun the simulator tests with the Numba kernels disabled"""
+    def setUp(self):
+        patcher = mock.patch("main.HAS_NUMBA", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
 if __name__ == '__main__':
     unittest.main()